@@ -19,6 +19,12 @@ class AgentState(TypedDict):
     response: str                  # Итоговый ответ
 
 class NewsAgent:
+    SENTIMENT_EMOJI = {
+        'positive': '🟢',
+        'neutral': '⚪',
+        'negative': '🔴',
+    }
+    
     def __init__(self):
         self.tools = NewsSearchTools()
         self.graph = self._build_graph()
@@ -82,11 +88,21 @@ class NewsAgent:
         response_lines = [
             f"📊 Новости по {ticker} ({stock_info['name']})",
             f"💰 Цена: {stock_info['price']:.2f} ₽",
-            f"📰 Найдено новостей: {len(news_list)}\n"
+            f"📰 Найдено новостей: {len(news_list)}"
         ]
         
+        # Тональность посчитана при сборе новостей, здесь только агрегируем
+        mood = self.tools.news_mood(news_list[:5], ticker)
+        if mood is not None:
+            response_lines.append(f"{self._mood_label(mood)} (оценка {mood:+.2f})")
+        response_lines.append("")
+        
         for i, news in enumerate(news_list[:5], 1):
-            response_lines.append(f"{i}. [{news['source']}] {news['title']}")
+            emoji = ''
+            if self.tools.sentiment_score(news) is not None:
+                emoji = self.SENTIMENT_EMOJI.get(news.get('sentiment'), '')
+            prefix = f"{emoji} " if emoji else ""
+            response_lines.append(f"{i}. {prefix}[{news['source']}] {news['title']}")
             response_lines.append(f"   🔗 {news['link']}")
             response_lines.append("")
         
@@ -95,6 +111,14 @@ class NewsAgent:
         
         return state
     
+    @staticmethod
+    def _mood_label(mood: float) -> str:
+        if mood > 0.2:
+            return "📈 Фон новостей: позитивный"
+        if mood < -0.2:
+            return "📉 Фон новостей: негативный"
+        return "➖ Фон новостей: нейтральный"
+    
     def _build_graph(self) -> StateGraph:
         """Создаёт граф обработки"""
         workflow = StateGraph(AgentState)
@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+pytest.importorskip('langgraph')
+
+from src.agent.graph import NewsAgent
+from src.agent.test_tools import NEWS, make_tools  # noqa: F401 (фикстура)
+
+
+def test_format_response_tone(make_tools):
+    """Строка фона новостей и значки только у оценённых новостей"""
+    agent = NewsAgent.__new__(NewsAgent)
+    agent.tools = make_tools(NEWS)
+    state = {
+        'ticker': 'GAZP',
+        'stock_info': agent.tools.get_stock_info('GAZP'),
+        'news': agent.tools.search_news('GAZP').to_dict('records'),
+    }
+
+    lines = agent._format_response(state)['response'].split('\n')
+
+    assert lines[3] == "➖ Фон новостей: нейтральный (оценка -0.16)"
+    assert "1. 🟢 [rbc] Газпром нарастил экспорт" in lines
+    assert "2. 🔴 [rbc] Газпром: итоги года" in lines
+    assert "3. [interfax] Рынок газа" in lines
@@ -0,0 +1,90 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+from src.agent.tools import NewsSearchTools
+
+STOCKS = [
+    {'ticker': 'GAZP', 'name': 'ГАЗПРОМ ао', 'price': 120.5},
+    {'ticker': 'LKOH', 'name': 'ЛУКОЙЛ', 'price': 5400.0},
+    {'ticker': 'MGNT', 'name': 'Магнит ао', 'price': 3900.0},
+    {'ticker': 'LENT', 'name': 'Лента ао', 'price': 1500.0},
+    {'ticker': 'PLZL', 'name': 'Полюс', 'price': 2000.0},
+    {'ticker': 'SMLT', 'name': 'Самолет ао', 'price': 1100.0},
+]
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    return str(path)
+
+
+@pytest.fixture
+def make_tools(tmp_path):
+    def make(news):
+        return NewsSearchTools(
+            stocks_path=write_json(tmp_path / 'stocks.json', STOCKS),
+            news_path=write_json(tmp_path / 'news.json', news),
+            aliases_path=str(tmp_path / 'ticker_aliases.json'),
+        )
+    return make
+
+
+def test_find_ticker_lowercase_queries(make_tools):
+    """В запросах названия-обычные слова пишут с маленькой буквы и в падеже"""
+    tools = make_tools([])
+
+    assert tools.find_ticker("что с магнитом") == 'MGNT'
+    assert tools.find_ticker("новости полюса") == 'PLZL'
+    assert tools.find_ticker("что с самолетом") == 'SMLT'
+    assert tools.find_ticker("новости ленты") == 'LENT'
+    assert tools.find_ticker("Покажи новости про Газпром") == 'GAZP'
+    assert tools.find_ticker("погода в москве") is None
+
+
+NEWS = [
+    {'title': 'Газпром: итоги года', 'link': 'https://example.com/old', 'source': 'rbc',
+     'published': 'Mon, 05 Jan 2026 10:00:00 +0300', 'tickers': ['GAZP'],
+     'relevance': {'GAZP': 1.0}, 'sentiment': 'negative', 'sentiment_score': -0.9},
+    {'title': 'Газпром нарастил экспорт', 'link': 'https://example.com/fresh', 'source': 'rbc',
+     'published': 'Sat, 31 Jan 2026 10:00:00 +0300', 'tickers': ['GAZP'],
+     'relevance': {'GAZP': 0.7}, 'sentiment': 'positive', 'sentiment_score': 0.8},
+    {'title': 'Рынок газа', 'link': 'https://example.com/unscored', 'source': 'interfax',
+     'published': 'Fri, 30 Jan 2026 10:00:00 +0300', 'tickers': ['GAZP'],
+     'relevance': {'GAZP': 0.25}, 'sentiment': None, 'sentiment_score': None},
+    {'title': 'Обзор нефтегаза', 'link': 'https://example.com/mention', 'source': 'interfax',
+     'published': 'Sun, 01 Feb 2026 10:00:00 +0300', 'tickers': ['GAZP', 'LKOH'],
+     'relevance': {'GAZP': 0.1, 'LKOH': 0.7}, 'sentiment': 'positive', 'sentiment_score': 0.5},
+]
+
+
+def test_search_news_orders_by_relevance_band_then_date(make_tools):
+    """Внутри полосы релевантности свежая новость выше старой с большей оценкой"""
+    tools = make_tools(NEWS)
+
+    found = tools.search_news('GAZP')
+    assert found['link'].tolist() == [
+        'https://example.com/fresh',
+        'https://example.com/old',
+        'https://example.com/unscored',
+        'https://example.com/mention',
+    ]
+    assert tools.search_news('LKOH')['link'].tolist() == ['https://example.com/mention']
+    assert len(tools.search_news('GAZP', limit=2)) == 2
+
+
+def test_news_mood_skips_unscored(make_tools):
+    tools = make_tools(NEWS)
+    news_list = tools.search_news('GAZP').to_dict('records')
+
+    # После pd.read_json пропуск оценки — NaN
+    assert tools.sentiment_score(news_list[2]) is None
+    assert tools.sentiment_score(news_list[0]) == 0.8
+
+    expected = (0.7 * 0.8 + 1.0 * -0.9 + 0.1 * 0.5) / (0.7 + 1.0 + 0.1)
+    assert tools.news_mood(news_list, 'GAZP') == pytest.approx(expected)
+    assert tools.news_mood(news_list[2:3], 'GAZP') is None
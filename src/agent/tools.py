@@ -2,40 +2,41 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+import math
 import pandas as pd
 import logging
-import re
+from bisect import bisect_right
 from typing import Optional
+from src.data_ingestion.ticker_aliases import TickerAliases
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
 class NewsSearchTools:
+    # Полосы релевантности: упоминание в тексте / компания в заголовке.
+    # Внутри полосы новости идут от свежих к старым, иначе старая новость
+    # с оценкой 1.0 всегда выше вчерашней с 0.7
+    RELEVANCE_BANDS = (0.2, 0.5)
+    
     def __init__(self, stocks_path: str = "data/stocks.json", 
-                 news_path: str = "data/news.json"):
+                 news_path: str = "data/news.json",
+                 aliases_path: str = "data/ticker_aliases.json"):
         self.stocks_df = pd.read_json(stocks_path)
         self.news_df = pd.read_json(news_path)
         
-        # Создаём словарь для обратного поиска
-        self.name_to_ticker = {
-            name.lower(): ticker 
-            for ticker, name in zip(self.stocks_df['ticker'], self.stocks_df['name'])
-        }
+        # Словарь синонимов, собранный при сборе данных
+        self.aliases = TickerAliases.load_or_build(self.stocks_df, aliases_path)
         
-        # Создаём словарь всех вариантов написания
-        self.all_variants = {}
+        # Нормализованные названия для частичного совпадения
+        # (обычные слова вроде "система" ищутся только через словарь синонимов)
+        self.name_to_ticker = {}
         for ticker, name in zip(self.stocks_df['ticker'], self.stocks_df['name']):
-            # Добавляем разные варианты
-            variants = [
-                name.lower(),                    # "газпром"
-                ticker.lower(),                  # "gazp"
-                ticker.upper(),                  # "GAZP"
-            ]
-            for variant in variants:
-                self.all_variants[variant] = ticker
+            normalized = TickerAliases.normalize_name(name)
+            if normalized not in TickerAliases.COMMON_WORDS:
+                self.name_to_ticker[normalized] = ticker
         
         logger.info(f"Загружено: {len(self.stocks_df)} акций, {len(self.news_df)} новостей")
-        logger.info(f"Варианты поиска: {list(self.all_variants.keys())[:10]}...")
+        logger.info(f"Варианты поиска: {len(self.aliases.aliases)} форм")
     
     def find_ticker(self, query: str) -> Optional[str]:
         """
@@ -48,19 +49,12 @@ class NewsSearchTools:
         
         logger.info(f"   🔍 Анализ запроса: '{query_lower}'")
         
-        # Способ 1: Прямой поиск тикера в тексте (GAZP, SBER)
-        # Ищем слова из 3-5 заглавных букв
-        ticker_candidates = re.findall(r'\b([A-Z]{3,5})\b', query)
-        for candidate in ticker_candidates:
-            if candidate in self.stocks_df['ticker'].values:
-                logger.info(f"   ✓ Найден тикер напрямую: {candidate}")
-                return candidate
-        
-        # Способ 2: Поиск по всем вариантам (газпром, сбербанк и т.д.)
-        for variant, ticker in self.all_variants.items():
-            if variant in query_lower:
-                logger.info(f"   ✓ Найдено совпадение: '{variant}' → {ticker}")
-                return ticker
+        # Способ 1-2: Тикер в тексте (GAZP, SBER) или название в любом падеже.
+        # Запрос адресован агенту, поэтому "магнит", "полюс" и с маленькой буквы — компании
+        tickers = self.aliases.find(query, strict_case=False)
+        if tickers:
+            logger.info(f"   ✓ Найдено совпадение: {tickers[0]}")
+            return tickers[0]
         
         # Способ 3: Частичное совпадение (газпр → газпром)
         for name, ticker in self.name_to_ticker.items():
@@ -79,10 +73,52 @@ class NewsSearchTools:
             self.news_df['tickers'].apply(lambda x: ticker in x if isinstance(x, list) else False)
         ]
         
+        filtered = filtered.copy()
+        sort_cols = []
+        
+        # Релевантность к тикеру посчитана при сборе (NewsEnricher)
+        if 'relevance' in filtered.columns:
+            relevance = filtered['relevance'].apply(
+                lambda x: x.get(ticker, 0.0) if isinstance(x, dict) else 0.0
+            )
+            filtered['_band'] = relevance.apply(lambda r: bisect_right(self.RELEVANCE_BANDS, r))
+            sort_cols.append('_band')
+        
+        # Даты в RSS в формате RFC 822, строковая сортировка по ним неверна
         if 'published' in filtered.columns:
-            filtered = filtered.sort_values('published', ascending=False)
+            filtered['_published'] = pd.to_datetime(filtered['published'], utc=True, errors='coerce', format='mixed')
+            sort_cols.append('_published')
+        
+        if sort_cols:
+            filtered = filtered.sort_values(sort_cols, ascending=False, na_position='last')
         
-        return filtered.head(limit)
+        return filtered.drop(columns=['_band', '_published'], errors='ignore').head(limit)
+    
+    @staticmethod
+    def sentiment_score(news: dict) -> Optional[float]:
+        """Оценка тональности или None (после pd.read_json пропуск приходит как NaN)"""
+        score = news.get('sentiment_score')
+        if isinstance(score, (int, float)) and math.isfinite(score):
+            return float(score)
+        return None
+    
+    @staticmethod
+    def relevance(news: dict, ticker: str) -> float:
+        relevance = news.get('relevance')
+        if isinstance(relevance, dict):
+            return relevance.get(ticker, 0.0) or 0.0
+        return 0.0
+    
+    def news_mood(self, news_list: list, ticker: str) -> Optional[float]:
+        """
+        Фон новостей в [-1, 1]: средняя тональность, взвешенная по релевантности.
+        Новости без оценки (модель была недоступна) не учитываются; None — если оценённых нет
+        """
+        scored = [n for n in news_list if self.sentiment_score(n) is not None]
+        if not scored:
+            return None
+        weights = [max(self.relevance(n, ticker), 0.1) for n in scored]
+        return sum(w * self.sentiment_score(n) for w, n in zip(weights, scored)) / sum(weights)
     
     def get_stock_info(self, ticker: str) -> Optional[dict]:
         """Получает информацию об акции"""
@@ -0,0 +1,224 @@
+import os
+import sys
+import logging
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.data_ingestion.moex_service import MOEXService
+
+logger = logging.getLogger(__name__)
+
+
+class MOEXHistory:
+    """
+    История цен с MOEX ISS с локальным кэшем.
+    Свечи каждого тикера хранятся в колоночном виде (.npz: массив на колонку),
+    при повторном запросе догружаются только недостающие интервалы.
+    """
+    CACHE_DIR = os.path.join('data', 'candles')
+    PRICE_COLUMNS = ['open', 'close', 'high', 'low', 'volume']
+    # Длительность свечи для каждого interval ISS (месячные — по календарю, см. _candle_end)
+    CANDLE_DURATION = {
+        1: np.timedelta64(1, 'm'),
+        10: np.timedelta64(10, 'm'),
+        60: np.timedelta64(1, 'h'),
+        24: np.timedelta64(1, 'D'),
+        7: np.timedelta64(7, 'D'),
+    }
+
+    def __init__(self, cache_dir: str = None, interval: int = 24, max_workers: int = 8,
+                 fetch_candles=None):
+        self.cache_dir = cache_dir or self.CACHE_DIR
+        self.interval = interval
+        self.max_workers = max_workers
+        # Источник свечей можно подменить (например, записанными ответами ISS)
+        self.fetch_candles = fetch_candles or MOEXService.get_candles
+
+    def _cache_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker}_{self.interval}.npz")
+
+    def _load(self, ticker: str):
+        """Возвращает (candles_df, covered_from, covered_till) или (None, None, None)"""
+        path = self._cache_path(ticker)
+        if not os.path.exists(path):
+            return None, None, None
+
+        with np.load(path) as data:
+            df = pd.DataFrame({col: data[col] for col in self.PRICE_COLUMNS})
+            df.insert(0, 'begin', data['begin'])
+            covered_from = date.fromisoformat(str(data['covered_from']))
+            covered_till = date.fromisoformat(str(data['covered_till']))
+        return df, covered_from, covered_till
+
+    def _save(self, ticker: str, df: pd.DataFrame, covered_from: date, covered_till: date):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        arrays = {col: df[col].to_numpy(dtype=np.float64) for col in self.PRICE_COLUMNS}
+        np.savez(
+            self._cache_path(ticker),
+            begin=df['begin'].to_numpy(dtype='datetime64[s]'),
+            covered_from=np.array(covered_from.isoformat()),
+            covered_till=np.array(covered_till.isoformat()),
+            **arrays,
+        )
+
+    def _missing_ranges(self, date_from: date, date_till: date,
+                        covered_from: date, covered_till: date) -> list:
+        """Интервалы, которых нет в кэше (кэш всегда покрывает один непрерывный отрезок)"""
+        if covered_from is None:
+            return [(date_from, date_till)]
+
+        ranges = []
+        if date_from < covered_from:
+            ranges.append((date_from, covered_from - timedelta(days=1)))
+        if date_till > covered_till:
+            # Последний день мог быть неполным — перезапрашиваем его
+            ranges.append((covered_till, date_till))
+        return ranges
+
+    def get_history(self, ticker: str, date_from: str, date_till: str = None) -> pd.DataFrame:
+        """Свечи тикера за период, из кэша с догрузкой недостающего"""
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_till) if date_till else date.today()
+
+        cached, covered_from, covered_till = self._load(ticker)
+        missing = self._missing_ranges(start, end, covered_from, covered_till)
+
+        if missing:
+            parts = [] if cached is None else [cached]
+            for part_from, part_till in missing:
+                logger.info(f"   📥 {ticker}: {part_from} → {part_till}")
+                parts.append(self.fetch_candles(
+                    ticker, part_from.isoformat(), part_till.isoformat(), self.interval
+                ))
+
+            parts = [p for p in parts if not p.empty]
+            if parts:
+                cached = pd.concat(parts, ignore_index=True)
+            else:
+                cached = pd.DataFrame(columns=MOEXService.CANDLE_COLUMNS)
+            cached['begin'] = pd.to_datetime(cached['begin'])
+            # Перезапрошенный день заменяет старую версию свечи
+            cached = (cached.drop_duplicates('begin', keep='last')
+                            .sort_values('begin')
+                            .reset_index(drop=True))
+
+            covered_from = min(start, covered_from) if covered_from else start
+            covered_till = max(end, covered_till) if covered_till else end
+            # Будущие дни ISS ещё не отдал — покрыты только дни до сегодняшнего
+            covered_till = min(covered_till, date.today())
+            self._save(ticker, cached, covered_from, covered_till)
+
+        mask = (cached['begin'] >= pd.Timestamp(start)) & \
+               (cached['begin'] < pd.Timestamp(end + timedelta(days=1)))
+        return cached[mask].reset_index(drop=True)
+
+    def get_histories(self, tickers: list, date_from: str, date_till: str = None) -> dict:
+        """Параллельная загрузка истории для многих тикеров: {ticker: DataFrame}"""
+        def load(ticker):
+            try:
+                return ticker, self.get_history(ticker, date_from, date_till)
+            except Exception as e:
+                logger.error(f"❌ Ошибка истории {ticker}: {e}")
+                return ticker, pd.DataFrame(columns=MOEXService.CANDLE_COLUMNS)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = dict(executor.map(load, tickers))
+
+        logger.info(f"✅ История цен: {len(results)} тикеров")
+        return results
+
+    @staticmethod
+    def to_moscow_time(published: pd.Series) -> np.ndarray:
+        """Даты RSS (RFC 822, с часовым поясом) → datetime64 по Москве, как у свечей ISS"""
+        ts = pd.to_datetime(published, utc=True, errors='coerce', format='mixed')
+        return ts.dt.tz_convert('Europe/Moscow').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+    def _candle_end(self, begin: np.ndarray) -> np.ndarray:
+        """Конец каждой свечи; месячная свеча заканчивается в начале следующего месяца"""
+        if self.interval == 31:
+            return (begin.astype('datetime64[M]') + 1).astype('datetime64[ns]')
+        return begin + self.CANDLE_DURATION[self.interval]
+
+    def event_returns(self, candles: pd.DataFrame, event_times: np.ndarray,
+                      windows: tuple = (-5, -1, 1, 3, 5)) -> np.ndarray:
+        """
+        Доходности вокруг событий, матрица (события × окна).
+        База — закрытие последней свечи, завершившейся до события.
+        Окно k > 0: закрытие k-й свечи после базы относительно базы.
+        Окно k < 0: движение за |k| свечей до базы.
+        Где данных не хватает — NaN.
+        """
+        windows = np.asarray(windows)
+        event_times = np.asarray(event_times, dtype='datetime64[ns]')
+        result = np.full((len(event_times), len(windows)), np.nan)
+        if candles.empty or len(event_times) == 0:
+            return result
+
+        begin = candles['begin'].to_numpy(dtype='datetime64[ns]')
+        close = candles['close'].to_numpy(dtype=np.float64)
+        n = len(close)
+
+        # Новость в выходные или после закрытия относится к следующей свече
+        end = self._candle_end(begin)
+        base_idx = np.searchsorted(end, event_times, side='right') - 1
+
+        # Для k > 0 — конец окна после события, для k < 0 — начало окна до базы
+        target_idx = base_idx[:, None] + windows
+        valid = (
+            (base_idx[:, None] >= 0)
+            & (target_idx >= 0) & (target_idx < n)
+            & ~np.isnat(event_times)[:, None]
+        )
+
+        base = close[np.clip(base_idx, 0, n - 1)][:, None]
+        target = close[np.clip(target_idx, 0, n - 1)]
+        returns = np.where(windows > 0, target / base - 1, base / target - 1)
+        result[valid] = returns[valid]
+        return result
+
+    def news_impact(self, news_df: pd.DataFrame, windows: tuple = (-5, -1, 1, 3, 5),
+                    days_before: int = 10, days_after: int = 10) -> pd.DataFrame:
+        """
+        Таблица (новость, тикер) с доходностями в окнах вокруг published.
+        Колонки: link, ticker, published, ret_<k> для каждого окна
+        """
+        pairs = news_df[['link', 'published', 'tickers']].explode('tickers').dropna(subset=['tickers'])
+        pairs = pairs.rename(columns={'tickers': 'ticker'}).reset_index(drop=True)
+        columns = ['link', 'ticker', 'published'] + [f"ret_{k}" for k in windows]
+        if pairs.empty:
+            return pd.DataFrame(columns=columns)
+
+        pairs['event_time'] = self.to_moscow_time(pairs['published'])
+        known = pairs['event_time'].dropna()
+        if known.empty:
+            return pd.DataFrame(columns=columns)
+
+        # Один диапазон свечей на все тикеры с запасом под окна
+        date_from = (known.min() - timedelta(days=days_before)).date().isoformat()
+        date_till = min(known.max() + timedelta(days=days_after), pd.Timestamp(datetime.now())).date().isoformat()
+        histories = self.get_histories(pairs['ticker'].unique().tolist(), date_from, date_till)
+
+        returns = np.full((len(pairs), len(windows)), np.nan)
+        for ticker, idx in pairs.groupby('ticker').groups.items():
+            positions = pairs.index.get_indexer(idx)
+            returns[positions] = self.event_returns(
+                histories[ticker], pairs['event_time'].to_numpy()[positions], windows
+            )
+
+        result = pairs[['link', 'ticker', 'published']].copy()
+        for i, k in enumerate(windows):
+            result[f"ret_{k}"] = returns[:, i]
+        return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    history = MOEXHistory()
+    news_df = pd.read_json('data/news.json')
+    impact = history.news_impact(news_df[news_df['tickers'].apply(len) > 0])
+    print(impact.head(20))
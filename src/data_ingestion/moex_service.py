@@ -6,6 +6,9 @@ logger = logging.getLogger(__name__)
 
 class MOEXService:
     BASE_URL = "https://iss.moex.com/iss"
+    CANDLE_COLUMNS = ['begin', 'open', 'close', 'high', 'low', 'volume']
+    CANDLES_PAGE_SIZE = 500
+    CANDLES_MAX_PAGES = 1000
     
     @staticmethod
     def get_top_stocks(limit: int = 60) -> pd.DataFrame:
@@ -40,6 +43,50 @@ class MOEXService:
             logger.error(f"❌ Ошибка MOEX API: {e}")
             return pd.DataFrame(columns=['ticker', 'name', 'price'])
 
+    @staticmethod
+    def get_candles(ticker: str, date_from: str, date_till: str, interval: int = 24) -> pd.DataFrame:
+        """
+        Свечи ISS за период [date_from, date_till] (даты 'YYYY-MM-DD').
+        interval: 1, 10, 60 (минуты), 24 (день), 7 (неделя), 31 (месяц)
+        Возвращает DataFrame с колонками: begin, open, close, high, low, volume
+        """
+        url = f"{MOEXService.BASE_URL}/engines/stock/markets/shares/boards/TQBR/securities/{ticker}/candles.json"
+        params = {'from': date_from, 'till': date_till, 'interval': interval, 'start': 0}
+        
+        rows = []
+        # ISS отдаёт свечи страницами; неполная страница — последняя.
+        # Лимит страниц защищает от зацикливания, если ISS проигнорирует start
+        for _ in range(MOEXService.CANDLES_MAX_PAGES):
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            page = MOEXService.parse_candles(response.json())
+            if not page.empty:
+                rows.append(page)
+            if len(page) < MOEXService.CANDLES_PAGE_SIZE:
+                break
+            params['start'] += len(page)
+        else:
+            logger.warning(f"⚠️ {ticker}: достигнут лимит {MOEXService.CANDLES_MAX_PAGES} страниц свечей")
+        
+        if not rows:
+            return pd.DataFrame(columns=MOEXService.CANDLE_COLUMNS)
+        return pd.concat(rows, ignore_index=True)
+    
+    @staticmethod
+    def parse_candles(data: dict) -> pd.DataFrame:
+        """Разбирает ответ ISS candles.json"""
+        columns = data['candles']['columns']
+        rows = data['candles']['data']
+        
+        df = pd.DataFrame(rows, columns=columns)
+        if df.empty:
+            return pd.DataFrame(columns=MOEXService.CANDLE_COLUMNS)
+        
+        df = df[MOEXService.CANDLE_COLUMNS].copy()
+        # Время ISS — московское, без часового пояса
+        df['begin'] = pd.to_datetime(df['begin'])
+        return df
+
 
 if __name__ == "__main__":
     df = MOEXService.get_top_stocks(limit=10)
@@ -0,0 +1,194 @@
+import os
+import sys
+import hashlib
+import sqlite3
+import logging
+import pandas as pd
+from contextlib import closing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.data_ingestion.ticker_aliases import TickerAliases
+
+logger = logging.getLogger(__name__)
+
+
+class NewsEnricher:
+    """
+    Обогащение новостей на этапе сбора: релевантность к каждому тикеру и тональность.
+    Результаты кэшируются по хэшу статьи в SQLite на диске, поэтому ни одна новость
+    не оценивается дважды, а на этапе запроса модель вообще не вызывается.
+    В памяти держится только текущая порция новостей, запись в кэш — только новых оценок.
+    """
+    # Небольшая модель, быстро работает на CPU
+    MODEL_NAME = "seara/rubert-tiny2-russian-sentiment"
+    CACHE_PATH = os.path.join('data', 'enrichment_cache.sqlite')
+
+    # Ограничение SQLite на число параметров в одном запросе
+    LOOKUP_BATCH = 500
+
+    # Вклад упоминаний в релевантность
+    TITLE_WEIGHT = 1.0
+    SUMMARY_WEIGHT = 0.5
+
+    def __init__(self, stocks_df: pd.DataFrame, cache_path: str = None,
+                 batch_size: int = 32, model_name: str = None, aliases: TickerAliases = None):
+        self.cache_path = cache_path or self.CACHE_PATH
+        self.batch_size = batch_size
+        self.model_name = model_name or self.MODEL_NAME
+        self._model = None
+
+        # Упоминания считаем по тому же словарю, что и теги тикеров
+        self.aliases = aliases or TickerAliases.load_or_build(stocks_df)
+
+    @staticmethod
+    def article_hash(title: str, summary: str) -> str:
+        """Хэш статьи по её тексту (ссылки у одной новости в разных лентах отличаются)"""
+        text = f"{title or ''}\n{summary or ''}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        conn = sqlite3.connect(self.cache_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            "article_hash TEXT PRIMARY KEY, sentiment TEXT, sentiment_score REAL)"
+        )
+        return conn
+
+    def _lookup_cache(self, hashes: list) -> dict:
+        """{hash: {'sentiment', 'sentiment_score'}} для уже оценённых статей"""
+        found = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(hashes), self.LOOKUP_BATCH):
+                batch = hashes[start:start + self.LOOKUP_BATCH]
+                rows = conn.execute(
+                    "SELECT article_hash, sentiment, sentiment_score FROM sentiment "
+                    f"WHERE article_hash IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for h, label, value in rows:
+                    found[h] = {'sentiment': label, 'sentiment_score': value}
+        return found
+
+    def _store_cache(self, scored: dict):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                [(h, v['sentiment'], v['sentiment_score']) for h, v in scored.items()],
+            )
+
+    def _get_model(self):
+        """Ленивая загрузка модели: если всё есть в кэше, модель не нужна"""
+        if self._model is None:
+            from transformers import pipeline
+
+            logger.info(f"Загрузка модели тональности '{self.model_name}'...")
+            self._model = pipeline(
+                "text-classification",
+                model=self.model_name,
+                device=-1,  # CPU
+            )
+            logger.info("✅ Модель загружена")
+        return self._model
+
+    def _score_sentiment(self, texts: list) -> list:
+        """Возвращает [(label, score)] для каждого текста; label: positive/neutral/negative"""
+        model = self._get_model()
+        results = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            # top_k=None → вероятности всех классов
+            outputs = model(batch, batch_size=self.batch_size, truncation=True, top_k=None)
+            for scores in outputs:
+                probs = {s['label'].lower(): s['score'] for s in scores}
+                label = max(probs, key=probs.get)
+                # Знаковая оценка в [-1, 1]
+                value = probs.get('positive', 0.0) - probs.get('negative', 0.0)
+                results.append((label, round(float(value), 4)))
+        return results
+
+    def _score_relevance(self, title: str, summary: str, tickers: list) -> dict:
+        """Релевантность новости каждому тикеру в [0, 1] по упоминаниям в заголовке и тексте"""
+        title_counts = self.aliases.count(title)
+        summary_counts = self.aliases.count(summary)
+
+        raw = {}
+        for ticker in tickers:
+            score = 0.0
+            if title_counts[ticker]:
+                score += self.TITLE_WEIGHT
+            score += self.SUMMARY_WEIGHT * min(summary_counts[ticker], 2)
+            raw[ticker] = score
+
+        if not raw:
+            return {}
+
+        # Новость про много компаний менее релевантна каждой из них
+        max_score = self.TITLE_WEIGHT + 2 * self.SUMMARY_WEIGHT
+        dilution = 1.0 / len(raw) ** 0.5
+        return {t: round(min(s / max_score, 1.0) * dilution, 4) for t, s in raw.items()}
+
+    def enrich(self, news_df: pd.DataFrame) -> pd.DataFrame:
+        """Добавляет колонки article_hash, sentiment, sentiment_score (None, если модель недоступна), relevance"""
+        if news_df.empty:
+            return news_df
+
+        df = news_df.copy()
+        df['article_hash'] = [
+            self.article_hash(title, summary)
+            for title, summary in zip(df['title'], df['summary'])
+        ]
+
+        cached = self._lookup_cache(list(dict.fromkeys(df['article_hash'])))
+
+        # Оцениваем только новости, которых нет в кэше
+        pending = {}
+        for h, title, summary in zip(df['article_hash'], df['title'], df['summary']):
+            if h not in cached and h not in pending:
+                pending[h] = f"{title}. {summary}".strip()
+
+        logger.info(f"🧠 Обогащение: {len(df)} новостей, новых для модели: {len(pending)}")
+
+        if pending:
+            try:
+                scored = self._score_sentiment(list(pending.values()))
+            except Exception as e:
+                # Без кэша: при следующем сборе эти новости будут оценены заново
+                logger.error(f"❌ Ошибка модели тональности: {e}")
+            else:
+                new_scores = {
+                    h: {'sentiment': label, 'sentiment_score': value}
+                    for h, (label, value) in zip(pending, scored)
+                }
+                self._store_cache(new_scores)
+                cached.update(new_scores)
+
+        # Неоценённые новости остаются без тональности (None), а не "нейтральными"
+        df['sentiment'] = [cached.get(h, {}).get('sentiment') for h in df['article_hash']]
+        df['sentiment_score'] = [cached.get(h, {}).get('sentiment_score') for h in df['article_hash']]
+        df['relevance'] = [
+            self._score_relevance(title, summary, tickers)
+            for title, summary, tickers in zip(df['title'], df['summary'], df['tickers'])
+        ]
+
+        return df
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_stocks = pd.DataFrame({
+        'ticker': ['GAZP', 'SBER', 'LKOH'],
+        'name': ['Газпром', 'Сбербанк', 'Лукойл'],
+    })
+    test_news = pd.DataFrame([
+        {'title': 'Сбербанк показал рекордную прибыль', 'summary': 'Сбербанк опубликовал результаты', 'tickers': ['SBER']},
+        {'title': 'Газпром сократил добычу', 'summary': 'Падение добычи у Газпром и Лукойл', 'tickers': ['GAZP', 'LKOH']},
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        enricher = NewsEnricher(test_stocks, cache_path=os.path.join(tmp_dir, 'enrichment_cache.sqlite'))
+        print(enricher.enrich(test_news)[['title', 'sentiment', 'sentiment_score', 'relevance']])
@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import queue
+import hashlib
+import logging
+import threading
+import feedparser
+import pandas as pd
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+logger = logging.getLogger(__name__)
+
+# Маркер конца потока между стадиями
+_END = object()
+
+
+class _Stopped(Exception):
+    """Конвейер остановлен из-за ошибки в другой стадии"""
+
+
+class NewsPipeline:
+    """
+    Потоковый сбор новостей: fetch → clean → tag → dedup → write.
+    Стадии работают в отдельных потоках и связаны очередями ограниченного размера,
+    запись идёт порциями по chunk_size, поэтому пиковая память не зависит от объёма входа
+    (кроме множества 8-байтовых хэшей для дедупликации). Кэш NewsEnricher — на диске (SQLite),
+    каждая порция читает и дописывает только свои статьи.
+    Источники — URL лент или локальные XML-файлы (архивные выгрузки RSS/Atom).
+    """
+
+    def __init__(self, rss: 'RSSService', enricher=None,
+                 queue_size: int = 256, chunk_size: int = 500):
+        self.rss = rss
+        self.enricher = enricher
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self._stop = threading.Event()
+        self._errors = []
+
+    # ---------- Чтение источников ----------
+
+    @staticmethod
+    def _local_name(tag: str) -> str:
+        return tag.rsplit('}', 1)[-1].lower()
+
+    def _iter_file_entries(self, path: str):
+        """Потоковый разбор XML-файла: <item> (RSS) и <entry> (Atom), без загрузки файла целиком"""
+        # Разобранные записи удаляем из родителя (<channel>/<feed>),
+        # иначе дерево в памяти растёт вместе с файлом
+        parents = []
+        for event, elem in ET.iterparse(path, events=('start', 'end')):
+            if event == 'start':
+                parents.append(elem)
+                continue
+            parents.pop()
+            if self._local_name(elem.tag) not in ('item', 'entry'):
+                continue
+
+            entry = {}
+            for child in elem:
+                name = self._local_name(child.tag)
+                if name == 'link':
+                    entry.setdefault('link', child.get('href') or (child.text or '').strip())
+                elif name in ('title', 'summary', 'description', 'published', 'pubdate', 'updated'):
+                    entry.setdefault(name, child.text or '')
+
+            yield {
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'published': entry.get('published') or entry.get('pubdate') or entry.get('updated'),
+                'summary': entry.get('summary', entry.get('description', '')),
+            }
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+
+    @staticmethod
+    def _iter_feed_entries(feed_url: str):
+        feed = feedparser.parse(feed_url)
+        if feed.bozo:
+            logger.warning(f"    ⚠️ Парсинг с ошибками: {feed.bozo_exception}")
+        for entry in feed.entries:
+            yield {
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'published': entry.get('published'),
+                'summary': entry.get('summary', entry.get('description', '')),
+            }
+
+    def _fetch(self, sources: dict, max_per_source: int = None):
+        """Стадия 1: сырые записи из всех источников"""
+        for source_name, location in sources.items():
+            logger.info(f"\n  {source_name}: {location}")
+            if os.path.exists(location):
+                entries = self._iter_file_entries(location)
+            else:
+                entries = self._iter_feed_entries(location)
+
+            count = 0
+            try:
+                for entry in entries:
+                    if max_per_source is not None and count >= max_per_source:
+                        break
+                    entry['source'] = source_name
+                    yield entry
+                    count += 1
+            except Exception as e:
+                # Битый источник не останавливает сбор остальных
+                logger.error(f"    ❌ Ошибка: {e}")
+            logger.info(f"    📄 Записей: {count}")
+
+    # ---------- Обработка ----------
+
+    def _clean(self, entries):
+        """Стадия 2: очистка текста, отбрасываем записи без заголовка"""
+        for entry in entries:
+            item = self.rss.clean_entry(entry)
+            if item is not None:
+                yield item
+
+    def _tag(self, items):
+        """Стадия 3: поиск тикеров"""
+        for item in items:
+            item['tickers'] = self.rss.extract_tickers(f"{item['title']} {item['summary']}")
+            yield item
+
+    @staticmethod
+    def _dedup(items):
+        """Стадия 4: дубликаты по ссылке, а без ссылки — по тексту"""
+        seen = set()
+        for item in items:
+            key = item['link'] or f"{item['title']}\n{item['summary']}"
+            digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            yield item
+
+    def iter_news(self, sources: dict, max_per_source: int = None):
+        """Те же стадии в текущем потоке, без очередей и записи (RSSService.fetch_all_news)"""
+        return self._dedup(self._tag(self._clean(self._fetch(sources, max_per_source))))
+
+    # ---------- Связка стадий ----------
+
+    def _put(self, q: queue.Queue, item):
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Stopped()
+
+    def _iter_queue(self, q: queue.Queue):
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped()
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _run_stage(self, stage, out_q: queue.Queue):
+        """Прогоняет генератор стадии в отдельном потоке, результат — в out_q"""
+        try:
+            for item in stage:
+                self._put(out_q, item)
+            self._put(out_q, _END)
+        except _Stopped:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Ошибка в конвейере: {e}")
+            self._errors.append(e)
+            self._stop.set()
+
+    def _start(self, stage) -> queue.Queue:
+        out_q = queue.Queue(maxsize=self.queue_size)
+        threading.Thread(target=self._run_stage, args=(stage, out_q), daemon=True).start()
+        return out_q
+
+    # ---------- Запись ----------
+
+    def _write_chunk(self, f, chunk: list, stats: dict):
+        if self.enricher is not None:
+            df = self.enricher.enrich(pd.DataFrame(chunk))
+            # В порции из оценённых и неоценённых новостей pandas хранит пропуски как NaN,
+            # а в JSON им место только как null
+            chunk = df.astype(object).where(df.notna(), None).to_dict('records')
+
+        for record in chunk:
+            f.write(",\n" if stats['total'] else "\n")
+            f.write(json.dumps(record, ensure_ascii=False, indent=2, allow_nan=False))
+            stats['total'] += 1
+            if record['tickers']:
+                stats['with_tickers'] += 1
+                stats['ticker_counts'].update(record['tickers'])
+        f.flush()
+
+    def run(self, sources: dict, output_path: str, max_per_source: int = None,
+            use_mock_if_empty: bool = False) -> dict:
+        """
+        Запускает конвейер и пишет JSON-массив записей (формат как у data/news.json).
+        Возвращает статистику: total, with_tickers, ticker_counts
+        """
+        self._stop.clear()
+        self._errors = []
+        stats = {'total': 0, 'with_tickers': 0, 'ticker_counts': Counter()}
+
+        logger.info("\n📡 Потоковый сбор новостей...")
+
+        q = self._start(self._fetch(sources, max_per_source))
+        q = self._start(self._clean(self._iter_queue(q)))
+        q = self._start(self._tag(self._iter_queue(q)))
+        q = self._start(self._dedup(self._iter_queue(q)))
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        # Пишем во временный файл, чтобы не испортить прежний результат при ошибке
+        tmp_path = output_path + '.tmp'
+
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write("[")
+                chunk = []
+                for item in self._iter_queue(q):
+                    chunk.append(item)
+                    if len(chunk) >= self.chunk_size:
+                        self._write_chunk(f, chunk, stats)
+                        logger.info(f"    💾 Записано: {stats['total']}")
+                        chunk = []
+                if chunk:
+                    self._write_chunk(f, chunk, stats)
+
+                if stats['with_tickers'] == 0 and use_mock_if_empty:
+                    logger.warning("\n⚠️ Не найдено новостей с тикерами!")
+                    logger.warning("Добавляем тестовые данные для демонстрации...")
+                    self._write_chunk(f, self.rss.create_mock_news(), stats)
+
+                f.write("\n]")
+        except _Stopped:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Ошибка записи: {e}")
+            self._errors.append(e)
+        finally:
+            self._stop.set()
+
+        if self._errors:
+            os.remove(tmp_path)
+            raise self._errors[0]
+
+        os.replace(tmp_path, output_path)
+        logger.info(f"💾 {output_path}: {stats['total']} записей, с тикерами: {stats['with_tickers']}")
+        return stats
+
+
+if __name__ == "__main__":
+    from src.data_ingestion.rss_service import RSSService
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    stocks_df = pd.read_json('data/stocks.json')
+    pipeline = NewsPipeline(RSSService(stocks_df))
+
+    # Локальные выгрузки: python news_pipeline.py dump1.xml dump2.xml
+    if len(sys.argv) > 1:
+        sources = {os.path.splitext(os.path.basename(p))[0]: p for p in sys.argv[1:]}
+    else:
+        sources = RSSService.FEED_URLS
+
+    stats = pipeline.run(sources, os.path.join('data', 'news_stream.json'))
+    print(f"Новостей: {stats['total']}, с тикерами: {stats['with_tickers']}")
@@ -1,9 +1,15 @@
-import feedparser
+import os
+import sys
 import re
 import logging
 import pandas as pd
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.data_ingestion.ticker_aliases import TickerAliases
+from src.data_ingestion.news_pipeline import NewsPipeline
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
@@ -15,104 +21,59 @@ class RSSService:
         'smart_lab': 'https://smart-lab.ru/rss/',
     }
     
-    def __init__(self, stocks_df: pd.DataFrame):
+    def __init__(self, stocks_df: pd.DataFrame, aliases: TickerAliases = None):
         self.known_tickers = set(stocks_df['ticker'].values)
         
-        # Создаём несколько вариантов для поиска
-        self.ticker_variants = {}
-        for ticker, name in zip(stocks_df['ticker'], stocks_df['name']):
-            # Все варианты в нижнем регистре для поиска
-            variants = [
-                name.lower(),           # "газпром"
-                name.upper(),           # "ГАЗПРОМ"
-                ticker.lower(),         # "gazp"
-                ticker.upper(),         # "GAZP"
-            ]
-            for variant in variants:
-                self.ticker_variants[variant] = ticker
+        # Словарь синонимов собирается при сборе данных (run_ingestion)
+        self.aliases = aliases or TickerAliases.load_or_build(stocks_df)
         
         logger.info(f"Инициализирован с {len(self.known_tickers)} тикерами")
-        logger.info(f"Варианты поиска: {list(self.ticker_variants.keys())[:10]}...")
+        logger.info(f"Варианты поиска: {len(self.aliases.aliases)} форм")
     
-    def _extract_tickers(self, text: str) -> list:
+    def extract_tickers(self, text: str) -> list:
         if not text:
             return []
         
-        found = set()
-        
-        # Способ 1: Прямой поиск тикеров (GAZP, SBER)
-        for candidate in re.findall(r'\b([A-Z]{3,5})\b', text):
-            if candidate in self.known_tickers:
-                found.add(candidate)
-        
-        # Способ 2: Поиск по всем вариантам (регистронезависимо)
-        text_lower = text.lower()
-        for variant, ticker in self.ticker_variants.items():
-            if variant.lower() in text_lower:
-                found.add(ticker)
-                logger.debug(f"    Найден '{variant}' → {ticker}")
-        
-        return list(found)
+        # Тикеры (GAZP, SBER) и названия компаний в любом падеже
+        return self.aliases.find(text)
     
-    def _clean_text(self, text: str) -> str:
+    def clean_text(self, text: str) -> str:
         if not text:
             return ""
         text = re.sub(r'<[^>]+>', '', text)
         text = re.sub(r'\s+', ' ', text)
         return text.strip()
     
-    def fetch_all_news(self, max_per_source: int = 30, use_mock_if_empty: bool = True) -> pd.DataFrame:
-        """Собирает новости из RSS"""
-        all_news = []
+    def clean_entry(self, entry: dict):
+        """Запись ленты (title, link, published, summary, source) → новость без тикеров или None"""
+        title = self.clean_text(entry.get('title'))
+        if not title:
+            return None
         
+        summary = self.clean_text(entry.get('summary'))
+        return {
+            'title': title[:200],
+            'link': entry.get('link') or '',
+            'published': entry.get('published') or datetime.now().isoformat(),
+            'source': entry['source'],
+            'summary': summary[:500]
+        }
+    
+    def fetch_all_news(self, max_per_source: int = 30, use_mock_if_empty: bool = True,
+                       sources: dict = None) -> pd.DataFrame:
+        """
+        Собирает новости из RSS в DataFrame — для небольших выборок.
+        Для больших объёмов — NewsPipeline.run с записью в файл по частям.
+        """
         logger.info("\n📡 Сбор новостей из RSS...")
         
-        for source_name, feed_url in self.FEED_URLS.items():
-            logger.info(f"\n  {source_name}: {feed_url}")
-            
-            try:
-                feed = feedparser.parse(feed_url)
-                
-                if feed.bozo:
-                    logger.warning(f"    ⚠️ Парсинг с ошибками: {feed.bozo_exception}")
-                
-                entries_count = len(feed.entries)
-                logger.info(f"    📄 Записей: {entries_count}")
-                
-                if entries_count == 0:
-                    continue
-                
-                collected = 0
-                tickers_found = 0
-                
-                for entry in feed.entries[:max_per_source]:
-                    title = self._clean_text(entry.get('title', ''))
-                    summary = self._clean_text(entry.get('summary', entry.get('description', '')))
-                    
-                    if not title:
-                        continue
-                    
-                    full_text = f"{title} {summary}"
-                    tickers = self._extract_tickers(full_text)
-                    
-                    all_news.append({
-                        'title': title[:200],
-                        'link': entry.get('link', ''),
-                        'published': entry.get('published', datetime.now().isoformat()),
-                        'source': source_name,
-                        'tickers': tickers,
-                        'summary': summary[:500]
-                    })
-                    collected += 1
-                    
-                    if tickers:
-                        tickers_found += 1
-                        logger.info(f"    ✅ [{', '.join(tickers)}] {title[:45]}...")
-                
-                logger.info(f"    📊 Собрано: {collected}, с тикерами: {tickers_found}")
-                
-            except Exception as e:
-                logger.error(f"    ❌ Ошибка: {e}")
+        # Те же стадии, что и в потоковом сборе, только без потоков и записи
+        pipeline = NewsPipeline(self)
+        all_news = []
+        for news in pipeline.iter_news(sources or self.FEED_URLS, max_per_source):
+            all_news.append(news)
+            if news['tickers']:
+                logger.info(f"    ✅ [{', '.join(news['tickers'])}] {news['title'][:45]}...")
         
         # Если не нашли новости с тикерами - добавляем mock данные
         news_with_tickers_count = len([n for n in all_news if n['tickers']])
@@ -120,7 +81,7 @@ class RSSService:
         if news_with_tickers_count == 0 and use_mock_if_empty:
             logger.warning("\n⚠️ Не найдено новостей с тикерами!")
             logger.warning("Добавляем тестовые данные для демонстрации...")
-            all_news.extend(self._create_mock_news())
+            all_news.extend(self.create_mock_news())
         
         df = pd.DataFrame(all_news)
         
@@ -137,7 +98,7 @@ class RSSService:
         
         return df
     
-    def _create_mock_news(self) -> list:
+    def create_mock_news(self) -> list:
         """Тестовые новости для демо"""
         return [
             {
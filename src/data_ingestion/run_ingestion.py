@@ -7,6 +7,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.data_ingestion.moex_service import MOEXService
 from src.data_ingestion.rss_service import RSSService
+from src.data_ingestion.news_enrichment import NewsEnricher
+from src.data_ingestion.news_pipeline import NewsPipeline
+from src.data_ingestion.ticker_aliases import TickerAliases
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -20,7 +23,11 @@ def save_dataframe(df: pd.DataFrame, filename: str):
     logger.info(f"💾 {path}: {len(df)} записей")
 
 
-def main():
+def main(feed_files: list = None):
+    """
+    feed_files: локальные XML-выгрузки лент для дозагрузки архива.
+    Без них новости собираются из RSSService.FEED_URLS.
+    """
     print("\n" + "="*60)
     print("ЭТАП 1: СБОР ДАННЫХ")
     print("="*60 + "\n")
@@ -35,30 +42,35 @@ def main():
     save_dataframe(stocks_df, 'stocks.json')
     logger.info(f"   Примеры: {stocks_df['ticker'].head(3).tolist()}\n")
     
-    logger.info("2. Сбор новостей из RSS...")
-    rss = RSSService(stocks_df)
-    news_df = rss.fetch_all_news(max_per_source=30)
+    logger.info("2. Словарь синонимов тикеров...")
+    aliases = TickerAliases.build(stocks_df)
+    aliases.save(os.path.join('data', 'ticker_aliases.json'))
     
-    save_dataframe(news_df, 'news.json')
+    logger.info("3. Сбор новостей с оценкой релевантности и тональности...")
+    pipeline = NewsPipeline(RSSService(stocks_df, aliases=aliases),
+                            enricher=NewsEnricher(stocks_df, aliases=aliases))
     
-    news_with_tickers = news_df[news_df['tickers'].apply(len) > 0]
+    if feed_files:
+        sources = {os.path.splitext(os.path.basename(p))[0]: p for p in feed_files}
+        stats = pipeline.run(sources, os.path.join('data', 'news.json'))
+    else:
+        stats = pipeline.run(RSSService.FEED_URLS, os.path.join('data', 'news.json'),
+                             max_per_source=30, use_mock_if_empty=True)
     
     print("\n" + "="*60)
     print("✅ ГОТОВО")
     print("="*60)
     print(f"Акций: {len(stocks_df)}")
-    print(f"Новостей: {len(news_df)}")
-    print(f"С тикерами: {len(news_with_tickers)}")
+    print(f"Новостей: {stats['total']}")
+    print(f"С тикерами: {stats['with_tickers']}")
     
-    if not news_with_tickers.empty:
-        all_tickers = [t for tickers in news_with_tickers['tickers'] for t in tickers]
-        ticker_counts = pd.Series(all_tickers).value_counts()
+    if stats['ticker_counts']:
         print(f"\nТоп-5 упоминаемых акций:")
-        for ticker, count in ticker_counts.head(5).items():
+        for ticker, count in stats['ticker_counts'].most_common(5):
             print(f"  {ticker}: {count} новостей")
     
     print("="*60 + "\n")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
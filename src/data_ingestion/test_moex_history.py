@@ -0,0 +1,140 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from src.data_ingestion.moex_service import MOEXService
+from src.data_ingestion.moex_history import MOEXHistory
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class RecordedISS:
+    """Отдаёт свечи из записанного ответа ISS и запоминает запросы"""
+    def __init__(self):
+        with open(os.path.join(FIXTURES_DIR, 'iss_candles_SBER_24.json'), encoding='utf-8') as f:
+            self.candles = MOEXService.parse_candles(json.load(f))
+        self.calls = []
+        # Последний день, за который у ISS уже есть свечи
+        self.available_till = None
+
+    def __call__(self, ticker, date_from, date_till, interval):
+        self.calls.append((ticker, date_from, date_till))
+        if self.available_till:
+            date_till = min(date_till, self.available_till)
+        begin = self.candles['begin']
+        mask = (begin >= pd.Timestamp(date_from)) & (begin < pd.Timestamp(date_till) + pd.Timedelta(days=1))
+        return self.candles[mask].reset_index(drop=True)
+
+
+def test_incremental_cache(tmp_path):
+    """Повторный запрос догружает только недостающие даты"""
+    iss = RecordedISS()
+    history = MOEXHistory(cache_dir=str(tmp_path), fetch_candles=iss)
+
+    first = history.get_history('SBER', '2026-01-26', '2026-01-30')
+    assert len(first) == 5
+    assert iss.calls == [('SBER', '2026-01-26', '2026-01-30')]
+
+    # Внутри кэша — без запросов
+    history.get_history('SBER', '2026-01-27', '2026-01-29')
+    assert len(iss.calls) == 1
+
+    # Расширение с двух сторон — только края
+    wider = history.get_history('SBER', '2026-01-19', '2026-02-06')
+    assert len(wider) == 15
+    assert iss.calls[1:] == [('SBER', '2026-01-19', '2026-01-25'), ('SBER', '2026-01-30', '2026-02-06')]
+    assert wider['begin'].is_monotonic_increasing and wider['begin'].is_unique
+
+
+def test_future_dates_are_not_cached(tmp_path, monkeypatch):
+    """Запрос с датой в будущем: дни после сегодняшнего догружаются, когда появятся"""
+    class Today(date):
+        current = date(2026, 1, 28)
+
+        @classmethod
+        def today(cls):
+            return cls.current
+
+    monkeypatch.setattr('src.data_ingestion.moex_history.date', Today)
+    iss = RecordedISS()
+    iss.available_till = '2026-01-28'
+    history = MOEXHistory(cache_dir=str(tmp_path), fetch_candles=iss)
+
+    assert len(history.get_history('SBER', '2026-01-26', '2026-02-06')) == 3
+
+    Today.current = date(2026, 2, 6)
+    iss.available_till = '2026-02-06'
+    assert len(history.get_history('SBER', '2026-01-26', '2026-02-06')) == 10
+    assert iss.calls[1:] == [('SBER', '2026-01-28', '2026-02-06')]
+
+
+def test_event_returns():
+    """Доходности считаются от последней закрытой свечи до события"""
+    history = MOEXHistory()
+    candles = RecordedISS().candles
+    close = candles.set_index('begin')['close']
+
+    events = MOEXHistory.to_moscow_time(pd.Series([
+        'Wed, 28 Jan 2026 14:00:00 +0300',   # внутри торгового дня
+        'Sat, 31 Jan 2026 12:00:00 +0300',   # выходной → реакция в понедельник
+        'not a date',
+    ]))
+    returns = history.event_returns(candles, events, windows=(-1, 1, 3))
+
+    base = close['2026-01-27']
+    assert np.isclose(returns[0, 1], close['2026-01-28'] / base - 1)
+    assert np.isclose(returns[0, 2], close['2026-01-30'] / base - 1)
+    assert np.isclose(returns[0, 0], base / close['2026-01-26'] - 1)
+
+    assert np.isclose(returns[1, 1], close['2026-02-02'] / close['2026-01-30'] - 1)
+    assert np.isnan(returns[2]).all()
+
+
+def test_monthly_candles_use_calendar_months():
+    """Событие 2 марта: база — февральская свеча, а не январская"""
+    history = MOEXHistory(interval=31)
+    candles = pd.DataFrame({
+        'begin': pd.to_datetime(['2026-01-01', '2026-02-01', '2026-03-01']),
+        'close': [100.0, 110.0, 121.0],
+    })
+    events = np.array(['2026-03-02T12:00'], dtype='datetime64[ns]')
+
+    returns = history.event_returns(candles, events, windows=(1,))
+    assert np.isclose(returns[0, 0], 121.0 / 110.0 - 1)
+
+
+def test_candles_pagination_stops(monkeypatch):
+    """Неполная страница завершает загрузку; повтор одной и той же страницы упирается в лимит"""
+    with open(os.path.join(FIXTURES_DIR, 'iss_candles_SBER_24.json'), encoding='utf-8') as f:
+        page = json.load(f)
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return page
+
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append(params['start'])
+        return Response()
+
+    monkeypatch.setattr('src.data_ingestion.moex_service.requests.get', fake_get)
+
+    # Страница из 15 свечей меньше полной — один запрос
+    assert len(MOEXService.get_candles('SBER', '2026-01-19', '2026-02-06')) == 15
+    assert calls == [0]
+
+    # ISS игнорирует start и всегда отдаёт "полную" страницу
+    monkeypatch.setattr(MOEXService, 'CANDLES_PAGE_SIZE', 15)
+    monkeypatch.setattr(MOEXService, 'CANDLES_MAX_PAGES', 3)
+    calls.clear()
+    assert len(MOEXService.get_candles('SBER', '2026-01-19', '2026-02-06')) == 45
+    assert calls == [0, 15, 30]
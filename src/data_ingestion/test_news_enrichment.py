@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+import pytest
+
+from src.data_ingestion.news_enrichment import NewsEnricher
+
+STOCKS = pd.DataFrame({
+    'ticker': ['GAZP', 'SBER', 'LKOH'],
+    'name': ['Газпром', 'Сбербанк', 'Лукойл'],
+})
+
+
+class StubModel:
+    """Вместо transformers: запоминает размеры батчей, всё считает позитивным"""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch, **kwargs):
+        self.batches.append(len(batch))
+        return [[
+            {'label': 'positive', 'score': 0.7},
+            {'label': 'neutral', 'score': 0.2},
+            {'label': 'negative', 'score': 0.1},
+        ] for _ in batch]
+
+
+def make_news(count: int) -> pd.DataFrame:
+    return pd.DataFrame([
+        {'title': f"Сбербанк: новость {i}", 'summary': 'Текст', 'tickers': ['SBER']}
+        for i in range(count)
+    ])
+
+
+@pytest.fixture
+def enricher(tmp_path):
+    enricher = NewsEnricher(STOCKS, cache_path=str(tmp_path / 'cache.sqlite'), batch_size=4)
+    enricher.model = StubModel()
+    enricher._get_model = lambda: enricher.model
+    return enricher
+
+
+def test_batching_and_cache(enricher):
+    """Модель вызывается батчами по batch_size, повторный enrich берёт всё из кэша"""
+    news = make_news(10)
+
+    first = enricher.enrich(news)
+    assert enricher.model.batches == [4, 4, 2]
+    assert (first['sentiment'] == 'positive').all()
+    assert first['sentiment_score'].tolist() == [0.6] * 10
+
+    second = enricher.enrich(news)
+    assert enricher.model.batches == [4, 4, 2]
+    assert second['sentiment_score'].tolist() == first['sentiment_score'].tolist()
+
+    # Кэш на диске: новый экземпляр (следующий запуск) тоже не вызывает модель
+    restarted = NewsEnricher(STOCKS, cache_path=enricher.cache_path, batch_size=4)
+    restarted._get_model = lambda: pytest.fail("модель не должна вызываться")
+    assert restarted.enrich(news)['sentiment_score'].tolist() == first['sentiment_score'].tolist()
+
+
+def test_model_failure_leaves_sentiment_empty(enricher):
+    """Без модели тональность не выдумывается"""
+    def broken():
+        raise ImportError("No module named 'transformers'")
+    enricher._get_model = broken
+
+    result = enricher.enrich(make_news(2))
+    assert result['sentiment'].isna().all()
+    assert result['sentiment_score'].isna().all()
+
+
+def test_score_relevance(enricher):
+    # Заголовок + два упоминания в тексте — максимум
+    assert enricher._score_relevance('Сбербанк растёт', 'Сбербанк и снова Сбербанк', ['SBER']) == {'SBER': 1.0}
+    # Только одно упоминание в тексте: 0.5 / 2
+    assert enricher._score_relevance('Рынок растёт', 'Сбербанк в плюсе', ['SBER']) == {'SBER': 0.25}
+    # Две компании: штраф 1/√2
+    assert enricher._score_relevance('Газпром и Лукойл', '', ['GAZP', 'LKOH']) == {
+        'GAZP': round(0.5 / 2 ** 0.5, 4),
+        'LKOH': round(0.5 / 2 ** 0.5, 4),
+    }
+    assert enricher._score_relevance('Рынок', '', []) == {}
@@ -0,0 +1,139 @@
+import sys
+import os
+import json
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+import pytest
+
+from src.data_ingestion.rss_service import RSSService
+from src.data_ingestion.news_pipeline import NewsPipeline
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SOURCES = {
+    'rss_dump': os.path.join(FIXTURES_DIR, 'rss_dump.xml'),
+    'atom_dump': os.path.join(FIXTURES_DIR, 'atom_dump.xml'),
+}
+
+
+def make_rss():
+    stocks_df = pd.DataFrame({
+        'ticker': ['GAZP', 'SBER', 'LKOH'],
+        'name': ['Газпром', 'Сбербанк', 'Лукойл'],
+    })
+    return RSSService(stocks_df)
+
+
+def test_pipeline_from_local_files(tmp_path):
+    """Очистка, теги и дедупликация; маленькие очереди и порции не меняют результат"""
+    output_path = str(tmp_path / 'news.json')
+    pipeline = NewsPipeline(make_rss(), queue_size=1, chunk_size=2)
+
+    stats = pipeline.run(SOURCES, output_path)
+
+    with open(output_path, encoding='utf-8') as f:
+        news = json.load(f)
+
+    assert [n['link'] for n in news] == [
+        'https://example.com/news/1',
+        'https://example.com/news/2',
+        'https://example.com/news/3',
+        'https://example.com/news/4',
+    ]
+    assert news[0]['summary'] == 'Крупнейший банк опубликовал результаты'
+    assert news[0]['tickers'] == ['SBER']
+    assert news[3]['source'] == 'atom_dump'
+    assert news[3]['published'] == '2026-01-30T14:00:00+03:00'
+
+    assert stats['total'] == 4
+    assert stats['with_tickers'] == 3
+    assert stats['ticker_counts']['GAZP'] == 1
+
+    # Результат читается так же, как data/news.json
+    assert len(pd.read_json(output_path)) == 4
+
+
+def test_pipeline_error_keeps_previous_output(tmp_path):
+    """Ошибка в стадии останавливает конвейер и не портит прежний файл"""
+    output_path = tmp_path / 'news.json'
+    output_path.write_text('[]', encoding='utf-8')
+
+    rss = make_rss()
+
+    def broken(text):
+        raise ValueError("broken tagger")
+    rss.extract_tickers = broken
+
+    with pytest.raises(ValueError):
+        NewsPipeline(rss, queue_size=1).run(SOURCES, str(output_path))
+
+    assert output_path.read_text(encoding='utf-8') == '[]'
+    assert not os.path.exists(str(output_path) + '.tmp')
+
+
+class PartialEnricher:
+    """Оценка есть только у части новостей (остальные — без кэша и модели)"""
+    def enrich(self, news_df):
+        df = news_df.copy()
+        scored = df['tickers'].apply(bool)
+        df['sentiment'] = ['positive' if s else None for s in scored]
+        df['sentiment_score'] = [0.5 if s else None for s in scored]
+        return df
+
+
+def test_pipeline_writes_missing_scores_as_null(tmp_path):
+    """Неоценённые новости в порции с оценёнными пишутся как null, а не NaN"""
+    output_path = tmp_path / 'news.json'
+    NewsPipeline(make_rss(), enricher=PartialEnricher()).run(SOURCES, str(output_path))
+
+    text = output_path.read_text(encoding='utf-8')
+    assert 'NaN' not in text
+    news = json.loads(text)
+    assert [n['sentiment_score'] for n in news] == [0.5, 0.5, None, 0.5]
+    assert [n['sentiment'] for n in news] == ['positive', 'positive', None, 'positive']
+
+
+def test_fetch_all_news_uses_pipeline_stages():
+    """fetch_all_news даёт те же новости, что и потоковый сбор"""
+    df = make_rss().fetch_all_news(max_per_source=None, use_mock_if_empty=False, sources=SOURCES)
+    assert df['link'].tolist() == [
+        'https://example.com/news/1',
+        'https://example.com/news/2',
+        'https://example.com/news/3',
+        'https://example.com/news/4',
+    ]
+
+
+def write_dump(path, count: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel><title>dump</title>\n')
+        for i in range(count):
+            f.write(
+                f"<item><title>Новость {i} про Сбербанк</title>"
+                f"<link>https://example.com/news/{i}</link>"
+                f"<description>{'Текст новости. ' * 20}</description>"
+                f"<pubDate>Fri, 30 Jan 2026 11:00:00 +0300</pubDate></item>\n"
+            )
+        f.write('</channel></rss>\n')
+
+
+def test_file_reader_memory_does_not_grow(tmp_path):
+    """Пиковая память разбора XML не зависит от числа записей в файле"""
+    pipeline = NewsPipeline(make_rss())
+
+    def peak_for(count):
+        path = str(tmp_path / f"dump_{count}.xml")
+        write_dump(path, count)
+        tracemalloc.start()
+        try:
+            assert sum(1 for _ in pipeline._iter_file_entries(path)) == count
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small = peak_for(2_000)
+    large = peak_for(20_000)
+    # Без удаления записей из <channel> пик растёт примерно в 10 раз
+    assert large < small * 1.5
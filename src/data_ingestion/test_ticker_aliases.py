@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pandas as pd
+
+from src.data_ingestion.ticker_aliases import TickerAliases
+
+STOCKS = pd.DataFrame({
+    'ticker': ['AFKS', 'ALRS', 'SBER', 'SBERP', 'ROSN', 'GAZP', 'SIBN', 'GAZA', 'T',
+               'MGNT', 'LENT', 'HEAD', 'FEES'],
+    'name': ['Система ао', 'АЛРОСА ао', 'Сбербанк', 'Сбербанк-п', 'Роснефть',
+             'ГАЗПРОМ ао', 'Газпрнефть', 'ГАЗ ао', 'Т-Техно ао',
+             'Магнит ао', 'Лента ао', 'Хэдхантер', 'Россети'],
+})
+
+
+def test_normalize_name():
+    assert TickerAliases.normalize_name('Система ао') == 'система'
+    assert TickerAliases.normalize_name('iАРТГЕН ао') == 'артген'
+    assert TickerAliases.normalize_name('ИнтерРАОао') == 'интеррао'
+    assert TickerAliases.normalize_name('Ижсталь2ао') == 'ижсталь'
+    assert TickerAliases.normalize_name('Сбербанк-п') == 'сбербанк'
+    assert TickerAliases.is_preferred('Сбербанк-п')
+    assert not TickerAliases.is_preferred('Сбербанк')
+
+
+def test_find_in_real_text():
+    aliases = TickerAliases.build(STOCKS)
+
+    assert aliases.find("Акции АФК Системы выросли") == ['AFKS']
+    assert aliases.find("Алросы снизила добычу") == ['ALRS']
+    assert aliases.find("что с роснефтью") == ['ROSN']
+    assert aliases.find("Газпром нефть и Газпромом") == ['SIBN', 'GAZP']
+    assert aliases.find("Т-Банк и SBER") == ['T', 'SBER']
+    # Обыкновенные акции важнее привилегированных
+    assert aliases.find("Сбербанка") == ['SBER']
+    # Целые слова и стоп-слова: "газ", "система" и одиночная "т" не дают тикеров
+    assert aliases.find("газ дорожает, система торгов, т.е. рост") == []
+    # Тикеры — только заглавными: английские слова не совпадают
+    assert aliases.find("head of research said fees rise") == []
+
+
+def test_inflect():
+    assert 'магниты' in TickerAliases.inflect('магнит')
+    assert 'магнити' not in TickerAliases.inflect('магнит')
+    assert 'газпромбанки' in TickerAliases.inflect('газпромбанк')
+    assert 'алросы' in TickerAliases.inflect('алроса')
+
+
+def test_curated_multiword_forms():
+    """Составные названия: склоняется и прилагательное"""
+    stocks = pd.DataFrame({'ticker': ['GMKN', 'MOEX'], 'name': ['ГМКНорНик', 'МосБиржа']})
+    aliases = TickerAliases.build(stocks)
+
+    assert aliases.find("акции Норильского никеля и Московской биржи") == ['GMKN', 'MOEX']
+
+
+def test_common_word_names():
+    """Названия-обычные слова — с заглавной буквы или в кавычках"""
+    aliases = TickerAliases.build(STOCKS)
+
+    assert aliases.find("Магнит открыл магазины") == ['MGNT']
+    assert aliases.find("акции «Ленты» и «магнита» подорожали") == ['LENT', 'MGNT']
+    assert aliases.find("магнит на холодильнике, лента новостей") == []
+    # Короткие названия — только заглавными
+    assert aliases.find("Газ дорожает") == []
+    assert aliases.find("ГАЗ выпустил новую модель") == ['GAZA']
+    # Без проверки регистра (запросы к агенту)
+    assert aliases.find("что с магнитом и лентой", strict_case=False) == ['MGNT', 'LENT']
+
+
+def test_count_each_mention_once():
+    aliases = TickerAliases.build(STOCKS)
+
+    assert aliases.count("SBER вырос") == {'SBER': 1}
+    assert aliases.count("SBER и Сбербанк, снова SBER") == {'SBER': 3}
+
+
+def test_versioned_artifact(tmp_path):
+    path = str(tmp_path / 'ticker_aliases.json')
+    TickerAliases.build(STOCKS).save(path)
+
+    loaded = TickerAliases.load_or_build(STOCKS, path)
+    assert loaded.find("Лукойл и АЛРОСА") == ['ALRS']
+
+    # Другой список акций — словарь пересобирается
+    other = pd.DataFrame({'ticker': ['LKOH'], 'name': ['ЛУКОЙЛ']})
+    assert TickerAliases.load_or_build(other, path).find("Лукойл и АЛРОСА") == ['LKOH']
+
+    # Старая версия правил — тоже
+    with open(path, encoding='utf-8') as f:
+        artifact = json.load(f)
+    artifact['version'] = TickerAliases.VERSION - 1
+    artifact['aliases'] = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f)
+    assert TickerAliases.load_or_build(STOCKS, path).find("АЛРОСА") == ['ALRS']
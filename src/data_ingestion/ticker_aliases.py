@@ -0,0 +1,358 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import pandas as pd
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TickerAliases:
+    """
+    Словарь синонимов тикеров: нормализованные названия MOEX (без "ао"/"ап"),
+    их падежные формы и ручные синонимы ("АФК Система", "Норникель").
+    Собирается один раз при сборе данных и сохраняется в data/ticker_aliases.json,
+    затем загружается в RSSService и NewsSearchTools.
+    Поиск идёт по целым словам через индекс по первому слову синонима.
+    """
+    # Увеличивать при изменении правил сборки — старый файл будет пересобран
+    VERSION = 3
+    PATH = os.path.join('data', 'ticker_aliases.json')
+
+    # Ручные синонимы: как компании называют в новостях
+    CURATED = {
+        'AFKS': ['афк система'],
+        'AFLT': ['аэрофлот'],
+        'ALRS': ['алроса'],
+        'BANE': ['башнефть'],
+        'CHMF': ['северсталь'],
+        'FEES': ['россети фск', 'фск еэс'],
+        'GAZP': ['газпром'],
+        'GMKN': ['норникель', 'норильский никель', 'гмк'],
+        'HEAD': ['хедхантер', 'headhunter', 'hh.ru'],
+        'HYDR': ['русгидро'],
+        'IRAO': ['интер рао', 'интеррао'],
+        'LKOH': ['лукойл'],
+        'MAGN': ['ммк', 'магнитогорский металлургический комбинат'],
+        'MGNT': ['сеть магнит', 'ритейлер магнит'],
+        'MOEX': ['мосбиржа', 'московская биржа'],
+        'MTSS': ['мтс'],
+        'NLMK': ['нлмк'],
+        'NVTK': ['новатэк'],
+        'OZON': ['озон', 'ozon'],
+        'PHOR': ['фосагро'],
+        'PIKK': ['группа пик', 'гк пик'],
+        'PLZL': ['полюс золото', 'золотодобытчик полюс'],
+        'ROSN': ['роснефть'],
+        'RTKM': ['ростелеком'],
+        'RUAL': ['русал'],
+        'SBER': ['сбербанк', 'сбер'],
+        'SIBN': ['газпром нефть', 'газпромнефть'],
+        'SMLT': ['гк самолет', 'девелопер самолет'],
+        'SNGS': ['сургутнефтегаз'],
+        'T': ['т-банк', 'тинькофф', 'т-технологии'],
+        'TATN': ['татнефть'],
+        'TRNFP': ['транснефть'],
+        'VKCO': ['вконтакте', 'vk company'],
+        'VTBR': ['втб'],
+        'X5': ['x5', 'икс 5', 'пятерочка'],
+        'YDEX': ['яндекс', 'yandex'],
+    }
+
+    # Падежи составных названий, где склоняется и прилагательное (inflect меняет только последнее слово)
+    CURATED_FORMS = {
+        'GMKN': ['норильского никеля', 'норильскому никелю', 'норильским никелем', 'норильском никеле'],
+        'MAGN': ['магнитогорского металлургического комбината',
+                 'магнитогорскому металлургическому комбинату',
+                 'магнитогорским металлургическим комбинатом',
+                 'магнитогорском металлургическом комбинате'],
+        'MOEX': ['московской биржи', 'московской бирже', 'московскую биржу', 'московской биржей'],
+    }
+
+    # Названия-обычные слова: ищутся только с заглавной буквы или в кавычках («Магнит»),
+    # короткие (до 3 букв, "ГАЗ", "ПИК") — только заглавными или в кавычках
+    COMMON_WORDS = {
+        'газ', 'система', 'магнит', 'полюс', 'кристалл', 'светофор', 'телеграф',
+        'приморье', 'лента', 'звезда', 'самолет', 'пик', 'элемент', 'базис', 'наука',
+    }
+
+    # Суффиксы типа акции в SHORTNAME: " ао", "-ап", "2ао", "-п", "ГКао", "-гдр"
+    SHARE_SUFFIX_RE = re.compile(
+        r'(?:[\s\-]+\d*(?:ао|ап|п|гдр)|(?<=[А-ЯЁA-Z])\d*а[оп]|\d+а[оп])$'
+    )
+    PREFERRED_RE = re.compile(r'(?:ап|п)$')
+    TOKEN_RE = re.compile(r'[0-9a-zа-я]+(?:[\-+.][0-9a-zа-я]+)*')
+    TICKER_RE = re.compile(r'\b([A-Z][A-Z0-9]{2,4})\b')
+    QUOTES = '«"„“\''
+    CYRILLIC_RE = re.compile(r'^[а-я\-]+$')
+
+    # Падежные окончания по последней букве слова: (сколько отрезать, окончания)
+    INFLECTIONS = {
+        'consonant': (0, ['а', 'у', 'ом', 'е', 'ы', 'ов', 'ам', 'ами', 'ах']),
+        'а': (1, ['ы', 'е', 'у', 'ой', 'ою']),
+        'я': (1, ['и', 'е', 'ю', 'ей']),
+        'ь': (1, ['и', 'ю', 'ем', 'я', 'ью']),
+        'й': (1, ['я', 'ю', 'ем', 'е', 'и', 'ев']),
+    }
+    VOWELS = set('аеиоуыэюяь')
+    # После г, к, х и шипящих пишется "и", а не "ы": "магниты", но "газпромбанки"
+    I_AFTER = set('гкхжшчщ')
+
+    def __init__(self, aliases: dict, known_tickers: set = None, stocks_hash: str = None,
+                 cased_aliases: dict = None):
+        self.aliases = aliases
+        # Синонимы-обычные слова: совпадение только с заглавной буквы или в кавычках
+        self.cased_aliases = cased_aliases or {}
+        self.known_tickers = set(known_tickers or aliases.values())
+        self.stocks_hash = stocks_hash
+        self._compile()
+
+    # ---------- Сборка ----------
+
+    @staticmethod
+    def _normalize_text(text: str) -> str:
+        return text.lower().replace('ё', 'е')
+
+    @classmethod
+    def normalize_name(cls, name: str) -> str:
+        """'Система ао' → 'система', 'iАРТГЕН ао' → 'артген', 'КурганГКап' → 'кургангк'"""
+        name = name.strip().replace('"', '')
+        name = re.sub(r'^i(?=[А-ЯЁ])', '', name)
+        name = re.sub(r'^(?:\+|МКПАО\s+)', '', name)
+        name = cls.SHARE_SUFFIX_RE.sub('', name)
+        return cls._normalize_text(name).strip(' .-')
+
+    @classmethod
+    def is_preferred(cls, name: str) -> bool:
+        suffix = cls.SHARE_SUFFIX_RE.search(name.strip())
+        return bool(suffix and cls.PREFERRED_RE.search(suffix.group(0)))
+
+    @classmethod
+    def inflect(cls, word: str) -> list:
+        """Падежные формы последнего слова (правила для существительных, без словаря)"""
+        *head, last = word.split(' ')
+        if len(last) < 4 or not cls.CYRILLIC_RE.match(last):
+            return [word]
+
+        ending = last[-1]
+        if ending not in cls.VOWELS and ending != 'й':
+            ending = 'consonant'
+        if ending not in cls.INFLECTIONS:
+            return [word]
+
+        cut, suffixes = cls.INFLECTIONS[ending]
+        stem = last[:-cut] if cut else last
+        if stem[-1] in cls.I_AFTER:
+            suffixes = ['и' if suffix == 'ы' else suffix for suffix in suffixes]
+        prefix = ' '.join(head + ['']) if head else ''
+        return [word] + [prefix + stem + suffix for suffix in suffixes]
+
+    @staticmethod
+    def stocks_fingerprint(stocks_df: pd.DataFrame) -> str:
+        lines = sorted(f"{t}\t{n}" for t, n in zip(stocks_df['ticker'], stocks_df['name']))
+        return hashlib.sha1('\n'.join(lines).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def build(cls, stocks_df: pd.DataFrame) -> 'TickerAliases':
+        """Собирает словарь из списка акций MOEX (колонки ticker, name)"""
+        known_tickers = set(stocks_df['ticker'])
+        aliases = {}
+        cased_aliases = {}
+        # Обыкновенные акции раньше привилегированных: "сбербанк" → SBER, а не SBERP
+        rows = sorted(zip(stocks_df['ticker'], stocks_df['name']),
+                      key=lambda row: cls.is_preferred(row[1]))
+
+        for ticker, name in rows:
+            normalized = cls.normalize_name(name)
+            if len(normalized) < 3:
+                continue
+            # Сами тикеры ищутся отдельно, только в верхнем регистре (TICKER_RE)
+            target = cased_aliases if normalized in cls.COMMON_WORDS else aliases
+            for form in cls.inflect(normalized):
+                target.setdefault(form, ticker)
+
+        # Ручные синонимы важнее автоматических
+        for ticker, curated in cls.CURATED.items():
+            if ticker not in known_tickers:
+                continue
+            forms = [form for alias in curated for form in cls.inflect(cls._normalize_text(alias))]
+            forms += cls.CURATED_FORMS.get(ticker, [])
+            for form in forms:
+                aliases[form] = ticker
+                cased_aliases.pop(form, None)
+
+        logger.info(f"Словарь синонимов: {len(aliases) + len(cased_aliases)} форм "
+                    f"для {len(known_tickers)} тикеров")
+        return cls(aliases, known_tickers, cls.stocks_fingerprint(stocks_df), cased_aliases)
+
+    # ---------- Хранение ----------
+
+    def save(self, path: str = None):
+        path = path or self.PATH
+        path_dir = os.path.dirname(path)
+        if path_dir:
+            os.makedirs(path_dir, exist_ok=True)
+        artifact = {
+            'version': self.VERSION,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'stocks_hash': self.stocks_hash,
+            'tickers': sorted(self.known_tickers),
+            'aliases': dict(sorted(self.aliases.items())),
+            'cased_aliases': dict(sorted(self.cased_aliases.items())),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, ensure_ascii=False, indent=1)
+        logger.info(f"💾 {path}: {len(self.aliases) + len(self.cased_aliases)} синонимов")
+
+    @classmethod
+    def load(cls, path: str = None) -> 'TickerAliases':
+        with open(path or cls.PATH, 'r', encoding='utf-8') as f:
+            artifact = json.load(f)
+        if artifact.get('version') != cls.VERSION:
+            raise ValueError(f"версия словаря {artifact.get('version')}, ожидается {cls.VERSION}")
+        return cls(artifact['aliases'], set(artifact['tickers']), artifact.get('stocks_hash'),
+                   artifact.get('cased_aliases'))
+
+    @classmethod
+    def load_or_build(cls, stocks_df: pd.DataFrame, path: str = None) -> 'TickerAliases':
+        """Готовый словарь, если он собран для этого же списка акций, иначе сборка заново"""
+        path = path or cls.PATH
+        if os.path.exists(path):
+            try:
+                aliases = cls.load(path)
+                if aliases.stocks_hash == cls.stocks_fingerprint(stocks_df):
+                    return aliases
+                logger.info("Словарь синонимов собран для другого списка акций — пересборка")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Не удалось загрузить словарь {path}: {e}")
+        return cls.build(stocks_df)
+
+    # ---------- Поиск ----------
+
+    def _compile(self):
+        """Индекс: первое слово синонима → [(слова синонима, тикер, только с заглавной)], длинные первыми"""
+        self.index = {}
+        for aliases, cased in ((self.aliases, False), (self.cased_aliases, True)):
+            for alias, ticker in aliases.items():
+                tokens = tuple(self.TOKEN_RE.findall(alias))
+                if tokens:
+                    self.index.setdefault(tokens[0], []).append((tokens, ticker, cased))
+        for candidates in self.index.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+
+    def _is_proper(self, text: str, start: int, end: int) -> bool:
+        """Слово написано как название: в кавычках, с заглавной (короткое — целиком заглавными)"""
+        if start > 0 and text[start - 1] in self.QUOTES:
+            return True
+        word = text[start:end]
+        if end - start <= 3:
+            return word.isupper()
+        return word[0].isupper()
+
+    def iter_matches(self, text: str, strict_case: bool = True):
+        """
+        Все упоминания тикеров в порядке появления в тексте; каждый фрагмент текста — один раз.
+        strict_case=False — названия-обычные слова ищутся в любом регистре
+        (запросы пользователя: "что с магнитом")
+        """
+        if not text:
+            return
+
+        matches = []
+        taken = set()
+
+        # Тикеры латиницей (GAZP, SBER) — только в верхнем регистре
+        for m in self.TICKER_RE.finditer(text):
+            if m.group(1) in self.known_tickers:
+                matches.append((m.start(), m.group(1)))
+                taken.add(m.start())
+
+        # Нормализация не меняет длину строки, поэтому позиции совпадают с исходным текстом
+        tokens = [t for t in self.TOKEN_RE.finditer(self._normalize_text(text))
+                  if t.start() not in taken]
+        words = [t.group(0) for t in tokens]
+        i = 0
+        while i < len(tokens):
+            step = 1
+            for alias_tokens, ticker, cased in self.index.get(words[i], ()):
+                n = len(alias_tokens)
+                if n > 1 and tuple(words[i:i + n]) != alias_tokens:
+                    continue
+                if cased and strict_case and not self._is_proper(text, tokens[i].start(), tokens[i].end()):
+                    continue
+                matches.append((tokens[i].start(), ticker))
+                step = n
+                break
+            i += step
+
+        for _, ticker in sorted(matches):
+            yield ticker
+
+    def find(self, text: str, strict_case: bool = True) -> list:
+        """Уникальные тикеры в порядке первого упоминания"""
+        return list(dict.fromkeys(self.iter_matches(text, strict_case)))
+
+    def count(self, text: str) -> Counter:
+        """Число упоминаний каждого тикера"""
+        return Counter(self.iter_matches(text))
+
+
+def _legacy_extract(ticker_variants: dict, known_tickers: set, text: str) -> set:
+    """Прежний поиск RSSService (подстроки из SHORTNAME) — для сравнения"""
+    found = {c for c in re.findall(r'\b([A-Z]{3,5})\b', text) if c in known_tickers}
+    text_lower = text.lower()
+    for variant, ticker in ticker_variants.items():
+        if variant.lower() in text_lower:
+            found.add(ticker)
+    return found
+
+
+def benchmark(stocks_path: str = "data/stocks.json", news_path: str = "data/news.json",
+              repeat: int = 20):
+    """Сравнение доли новостей с тикерами и скорости поиска: прежний способ vs словарь"""
+    import timeit
+
+    stocks_df = pd.read_json(stocks_path)
+    news_df = pd.read_json(news_path)
+    texts = [f"{t} {s}" for t, s in zip(news_df['title'], news_df['summary'])]
+
+    legacy_variants = {}
+    for ticker, name in zip(stocks_df['ticker'], stocks_df['name']):
+        for variant in (name.lower(), name.upper(), ticker.lower(), ticker.upper()):
+            legacy_variants[variant] = ticker
+    known_tickers = set(stocks_df['ticker'])
+
+    build_time = timeit.timeit(lambda: TickerAliases.build(stocks_df), number=1)
+    aliases = TickerAliases.build(stocks_df)
+
+    legacy = [_legacy_extract(legacy_variants, known_tickers, t) for t in texts]
+    current = [aliases.find(t) for t in texts]
+
+    legacy_time = timeit.timeit(
+        lambda: [_legacy_extract(legacy_variants, known_tickers, t) for t in texts], number=repeat)
+    current_time = timeit.timeit(lambda: [aliases.find(t) for t in texts], number=repeat)
+    per_article = 1e6 / (repeat * len(texts))
+
+    forms = len(aliases.aliases) + len(aliases.cased_aliases)
+    print(f"Новостей: {len(texts)}, сборка словаря: {build_time * 1000:.1f} мс, форм: {forms}")
+    print(f"{'':12}{'с тикерами':>12}{'мкс/новость':>14}")
+    print(f"{'прежний':12}{sum(map(bool, legacy)):>12}{legacy_time * per_article:>14.1f}")
+    print(f"{'словарь':12}{sum(map(bool, current)):>12}{current_time * per_article:>14.1f}")
+
+    print("\nРасхождения:")
+    for text, old, new in zip(texts, legacy, current):
+        if set(old) != set(new):
+            print(f"  {sorted(old)} → {new}: {text[:70]}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        TickerAliases.build(pd.read_json('data/stocks.json')).save()
+    else:
+        benchmark()